@@ -1,6 +1,7 @@
 from plinda.log import logger
 from plinda.tuples import Tuple, TextTuple, JsonTuple
-from plinda.templates import Template, Match, RegexTemplate, RegexMatch
+from plinda.templates import Template, Match, AnyTemplate, ExactTemplate, RegexTemplate, RegexMatch, MatchCache, \
+    ComparisonTemplate, RangeTemplate
 from plinda.spaces import TupleSpace
 from plinda.spaces.in_memory import InMemoryTupleSpace
 
@@ -3,10 +3,13 @@ import asyncio
 from plinda.templates import *
 from plinda.log import logger
 from asyncio import Future
-from typing import Iterable, Tuple as PyTuple, FrozenSet
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Sequence, Tuple as PyTuple, FrozenSet
 from dataclasses import dataclass, field
 from enum import Enum
+import pickle
 import uuid
+import weakref
 
 
 class TupleRepository:
@@ -22,6 +25,30 @@ class TupleRepository:
     def remove(self, template: Template, limit: int | None = 1) -> Iterable[Tuple]:
         raise NotImplementedError
 
+    def discard(self, tuple: Tuple) -> bool:
+        raise NotImplementedError
+
+    def count(self, template: Template) -> int:
+        return sum(1 for _ in self.find(template))
+
+    def match(self, template: Template, tuple: Tuple) -> Match | None:
+        return template.matches(tuple)
+
+    def lookup(self, template: Template, tuple: Tuple) -> PyTuple[bool, Match | None]:
+        return False, None
+
+    def remember(self, template: Template, tuple: Tuple, result: Match | None):
+        pass
+
+    def is_indexed(self, template: Template) -> bool:
+        return False
+
+    def find_extreme(self, template: Template, field: str, largest: bool = False) -> Tuple | None:
+        candidates = [t for t in self.find(template) if numeric_field(t, field) is not None]
+        if not candidates:
+            return None
+        return (max if largest else min)(candidates, key=lambda t: numeric_field(t, field))
+
     def clear(self):
         raise NotImplementedError
 
@@ -95,7 +122,7 @@ class RequestMatch:
         return len(self) > 0
 
     def __post_init__(self):
-        setattr(self, "requests", tuple(self.requests))
+        object.__setattr__(self, "requests", tuple(self.requests))
 
 
 class RequestRepository:
@@ -133,11 +160,35 @@ class RequestRepository:
             yield request
 
 
+def _matching_tuples(template: Template, tuples: Sequence[Tuple]) -> list[int]:
+    return [i for i, tuple in enumerate(tuples) if template.matches(tuple)]
+
+
+def _matching_templates(tuple: Tuple, templates: Sequence[Template]) -> list[int]:
+    return [i for i, template in enumerate(templates) if template.matches(tuple)]
+
+
+def _is_picklable(obj) -> bool:
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
 class TupleSpace:
-    def __init__(self, name: str, tuples: TupleRepository, requests: RequestRepository):
+    DEFAULT_CHUNK_SIZE = 1024
+
+    def __init__(self, name: str, tuples: TupleRepository, requests: RequestRepository,
+                 executor: Executor | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        assert chunk_size > 0
         self.__name = name
         self.__tuples = tuples
         self.__requests = requests
+        self.__executor = executor
+        self.__chunk_size = chunk_size
+        self.__lock = asyncio.Lock()
+        self.__picklable: weakref.WeakKeyDictionary[Template, bool] = weakref.WeakKeyDictionary()
 
     def __log(self, template: str, *args, **kwargs):
         logger.info("[%s#%s] " + template, self.__class__.__name__, self.name, *args, **kwargs)
@@ -146,12 +197,78 @@ class TupleSpace:
     def name(self):
         return self.__name
 
+    @property
+    def executor(self) -> Executor | None:
+        return self.__executor
+
+    def __can_offload(self, template: Template) -> bool:
+        if self.__executor is None or self.__tuples.is_indexed(template):
+            return False
+        if isinstance(self.__executor, ProcessPoolExecutor):
+            return self.__is_picklable(template)
+        return True
+
+    def __is_picklable(self, template: Template) -> bool:
+        try:
+            if template not in self.__picklable:
+                self.__picklable[template] = _is_picklable(template)
+            return self.__picklable[template]
+        except TypeError:  # unhashable or not weakly referenceable
+            return _is_picklable(template)
+
+    def __chunks(self, items: Sequence) -> Iterable[PyTuple[int, Sequence]]:
+        for start in range(0, len(items), self.__chunk_size):
+            yield start, items[start:start + self.__chunk_size]
+
+    async def __offload(self, function, subject, items: Sequence) -> list[int]:
+        loop = asyncio.get_running_loop()
+        chunks = list(self.__chunks(items))
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.__executor, function, subject, chunk) for _, chunk in chunks
+        ])
+        return [start + i for (start, _), indexes in zip(chunks, results) for i in indexes]
+
+    async def __find(self, template: Template, limit: int | None = None) -> Iterable[Tuple]:
+        if len(self.__tuples) <= self.__chunk_size or not self.__can_offload(template):
+            return self.__tuples.find(template, limit)
+        hits, misses = [], []
+        for tuple in self.__tuples.all_tuples():
+            known, match = self.__tuples.lookup(template, tuple)
+            if not known:
+                misses.append(tuple)
+            elif match:
+                hits.append(tuple)
+        if not misses or (limit is not None and 0 < limit <= len(hits)):
+            return hits
+        indexes = await self.__offload(_matching_tuples, template, misses)
+        matching = set(indexes)
+        for i, tuple in enumerate(misses):
+            if i not in matching:
+                self.__tuples.remember(template, tuple, None)
+        return hits + [misses[i] for i in indexes]
+
+    async def __requests_for(self, tuple: Tuple) -> RequestMatch:
+        if self.__executor is None:
+            return self.__requests.all_requests_for_tuple(tuple)
+        pending = list(self.__requests.all_requests())
+        templates = [request.template for request in pending]
+        if len(templates) <= self.__chunk_size or not all(self.__can_offload(t) for t in templates):
+            return self.__requests.all_requests_for_tuple(tuple)
+        if isinstance(self.__executor, ProcessPoolExecutor) and not _is_picklable(tuple):
+            return self.__requests.all_requests_for_tuple(tuple)
+        indexes = await self.__offload(_matching_templates, tuple, templates)
+        return RequestMatch([pending[i] for i in indexes])
+
     async def get_all(self) -> Iterable[Tuple]:
         return self.__tuples.all_tuples()
 
     async def write(self, tuple: Tuple):
+        async with self.__lock:
+            await self.__write(tuple)
+
+    async def __write(self, tuple: Tuple):
         self.__log("Writing: %s", tuple)
-        suspended = self.__requests.all_requests_for_tuple(tuple)
+        suspended = await self.__requests_for(tuple)
         to_insert = True
         if suspended:
             to_resume = []
@@ -173,10 +290,17 @@ class TupleSpace:
             self.__tuples.add(tuple)
             self.__log("Actually storing in tuple space: %s", tuple)
 
+    async def count(self, template: Template) -> int:
+        return self.__tuples.count(template)
+
     async def try_read(self, template: Template) -> Match | None:
+        async with self.__lock:
+            return await self.__try_read(template)
+
+    async def __try_read(self, template: Template) -> Match | None:
         self.__log("Attempt to read something matching: %s", template)
-        for tuple in self.__tuples.find(template):
-            match = template.matches(tuple)
+        for tuple in await self.__find(template, limit=1):
+            match = self.__tuples.match(template, tuple)
             if match:
                 self.__log("Read tuple: %s", tuple)
                 return match
@@ -184,16 +308,29 @@ class TupleSpace:
         return None
 
     async def read(self, template: Template) -> Match:
-        if match := await self.try_read(template):
-            return match
-        request = Request(template=template, kind=RequestKind.READ)
-        self.__requests.add(request)
-        self.__log("Suspending: %s", request)
+        async with self.__lock:
+            if match := await self.__try_read(template):
+                return match
+            request = Request(template=template, kind=RequestKind.READ)
+            self.__requests.add(request)
+            self.__log("Suspending: %s", request)
         return await request.result
 
     async def try_take(self, template: Template) -> Match | None:
+        async with self.__lock:
+            return await self.__try_take(template)
+
+    async def __try_take(self, template: Template) -> Match | None:
         self.__log("Attempt to take something matching: %s", template)
-        for tuple in self.__tuples.remove(template, limit=1):
+        if self.__can_offload(template):
+            candidates = []
+            for tuple in await self.__find(template):
+                if self.__tuples.discard(tuple):
+                    candidates.append(tuple)
+                    break
+        else:
+            candidates = self.__tuples.remove(template, limit=1)
+        for tuple in candidates:
             match = template.matches(tuple)
             assert match, "Removed tuple must match the template"
             self.__log("Took tuple: %s", tuple)
@@ -201,12 +338,57 @@ class TupleSpace:
         self.__log("No tuple matches the template: %s", template)
         return None
 
+    async def __find_extreme(self, template: Template, field: str, largest: bool) -> Tuple | None:
+        if len(self.__tuples) <= self.__chunk_size or not self.__can_offload(template):
+            return self.__tuples.find_extreme(template, field, largest)
+        candidates = [t for t in await self.__find(template) if numeric_field(t, field) is not None]
+        if not candidates:
+            return None
+        return (max if largest else min)(candidates, key=lambda t: numeric_field(t, field))
+
+    async def __try_read_extreme(self, template: Template, field: str, largest: bool) -> Match | None:
+        self.__log("Attempt to read the %s %s among tuples matching: %s", "max" if largest else "min", field, template)
+        tuple = await self.__find_extreme(template, field, largest)
+        if tuple is None:
+            self.__log("No tuple matches the template: %s", template)
+            return None
+        self.__log("Read tuple: %s", tuple)
+        return self.__tuples.match(template, tuple)
+
+    async def __try_take_extreme(self, template: Template, field: str, largest: bool) -> Match | None:
+        self.__log("Attempt to take the %s %s among tuples matching: %s", "max" if largest else "min", field, template)
+        while (tuple := await self.__find_extreme(template, field, largest)) is not None:
+            if self.__tuples.discard(tuple):
+                match = template.matches(tuple)
+                assert match, "Removed tuple must match the template"
+                self.__log("Took tuple: %s", tuple)
+                return match
+        self.__log("No tuple matches the template: %s", template)
+        return None
+
+    async def try_read_min(self, template: Template, field: str) -> Match | None:
+        async with self.__lock:
+            return await self.__try_read_extreme(template, field, largest=False)
+
+    async def try_read_max(self, template: Template, field: str) -> Match | None:
+        async with self.__lock:
+            return await self.__try_read_extreme(template, field, largest=True)
+
+    async def try_take_min(self, template: Template, field: str) -> Match | None:
+        async with self.__lock:
+            return await self.__try_take_extreme(template, field, largest=False)
+
+    async def try_take_max(self, template: Template, field: str) -> Match | None:
+        async with self.__lock:
+            return await self.__try_take_extreme(template, field, largest=True)
+
     async def take(self, template: Template) -> Match:
-        if match := await self.try_take(template):
-            return match
-        request = Request(template=template, kind=RequestKind.TAKE)
-        self.__requests.add(request)
-        self.__log("Suspending: %s", request)
+        async with self.__lock:
+            if match := await self.__try_take(template):
+                return match
+            request = Request(template=template, kind=RequestKind.TAKE)
+            self.__requests.add(request)
+            self.__log("Suspending: %s", request)
         return await request.result
 
 
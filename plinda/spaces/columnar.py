@@ -0,0 +1,192 @@
+from plinda.log import logger
+from plinda.spaces.in_memory import *
+from threading import RLock
+import math
+import numpy as np
+
+
+_EXACT_FLOAT_LIMIT = 2 ** 53
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _fits_int64(value) -> bool:
+    return isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX
+
+
+def _is_exact_float(value) -> bool:
+    return not isinstance(value, int) or -_EXACT_FLOAT_LIMIT <= value <= _EXACT_FLOAT_LIMIT
+
+
+def _compare_ints(column: np.ndarray, op: str, value: int | float) -> np.ndarray:
+    # compares an int64 column against value with Python's exact int/float semantics
+    if isinstance(value, float) and math.isnan(value):
+        return np.full(len(column), op == "!=")
+    if value > _INT64_MAX:
+        return np.full(len(column), op in ("<", "<=", "!="))
+    if value < _INT64_MIN:
+        return np.full(len(column), op in (">", ">=", "!="))
+    if isinstance(value, float) and not value.is_integer():
+        if op in ("==", "!="):
+            return np.full(len(column), op == "!=")
+        value, op = math.floor(value), {"<": "<=", "<=": "<=", ">": ">", ">=": ">"}[op]
+    return ComparisonTemplate.OPERATORS[op](column, int(value))
+
+
+class ColumnarTupleRepository(InMemoryTupleRepository):
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, *tuples: Tuple, fields: Iterable[str], cache_size: int = 0):
+        self.__fields = frozenset(fields)
+        assert self.__fields, "At least one numeric field must be declared."
+        self.__lock = RLock()
+        self.__reset()
+        super().__init__(*tuples, cache_size=cache_size)
+
+    def __reset(self):
+        # fields hold int64 columns until a float (or an int beyond int64) shows up
+        self.__columns = {field: np.zeros(self.INITIAL_CAPACITY, dtype=np.int64) for field in self.__fields}
+        self.__present = {field: np.zeros(self.INITIAL_CAPACITY, dtype=bool) for field in self.__fields}
+        self.__inexact: set[str] = set()
+        self.__alive = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        self.__rows: list[Tuple | None] = []
+        self.__row_of: dict[str, int] = {}
+        self.__free_rows: list[int] = []
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return self.__fields
+
+    def __grow(self):
+        capacity = 2 * len(self.__alive)
+        for field, column in self.__columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            self.__columns[field] = grown
+            present = np.zeros(capacity, dtype=bool)
+            present[:len(column)] = self.__present[field]
+            self.__present[field] = present
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.__alive)] = self.__alive
+        self.__alive = alive
+
+    def __store_value(self, field: str, row: int, value: int | float | None):
+        column = self.__columns[field]
+        self.__present[field][row] = value is not None
+        if value is None:
+            column[row] = 0
+            return
+        if column.dtype == np.int64 and not _fits_int64(value):
+            present = self.__present[field]
+            if ((column > _EXACT_FLOAT_LIMIT) | (column < -_EXACT_FLOAT_LIMIT))[present].any():
+                self.__inexact.add(field)
+            column = self.__columns[field] = column.astype(np.float64)
+        if column.dtype == np.float64 and not _is_exact_float(value):
+            self.__inexact.add(field)
+        column[row] = value
+
+    def __store_row(self, tuple: Tuple):
+        if not isinstance(tuple, JsonTuple) or not isinstance(tuple.data, dict) or tuple.id in self.__row_of:
+            return
+        if self.__free_rows:
+            row = self.__free_rows.pop()
+            self.__rows[row] = tuple
+        else:
+            row = len(self.__rows)
+            if row == len(self.__alive):
+                self.__grow()
+            self.__rows.append(tuple)
+        for field in self.__fields:
+            self.__store_value(field, row, numeric_field(tuple, field))
+        self.__alive[row] = True
+        self.__row_of[tuple.id] = row
+
+    def __drop_row(self, tuple: Tuple):
+        row = self.__row_of.pop(tuple.id, None)
+        if row is None:
+            return
+        self.__rows[row] = None
+        self.__alive[row] = False
+        for field in self.__fields:
+            self.__store_value(field, row, None)
+        self.__free_rows.append(row)
+
+    def __is_vectorizable(self, template: Template, *fields: str) -> bool:
+        if not isinstance(template, ComparisonTemplate) or not template.fields.union(fields) <= self.__fields:
+            return False
+        if self.__inexact.intersection(template.fields.union(fields)):
+            return False
+        for field, _, value in template.conditions:
+            if self.__columns[field].dtype == np.float64 and not _is_exact_float(value):
+                return False
+        return True
+
+    def __mask(self, template: ComparisonTemplate, *fields: str) -> np.ndarray:
+        size = len(self.__rows)
+        mask = self.__alive[:size].copy()
+        for field in template.fields.union(fields):
+            mask &= self.__present[field][:size]
+        for field, op, value in template.conditions:
+            column = self.__columns[field][:size]
+            if column.dtype == np.int64:
+                mask &= _compare_ints(column, op, value)
+            else:
+                mask &= ComparisonTemplate.OPERATORS[op](column, value)
+        return mask
+
+    def is_indexed(self, template: Template) -> bool:
+        return self.__is_vectorizable(template) or super().is_indexed(template)
+
+    def add(self, tuple: Tuple):
+        with self.__lock:
+            super().add(tuple)
+            self.__store_row(tuple)
+
+    def find(self, template: Template, limit: int | None = None) -> Iterable[Tuple]:
+        with self.__lock:
+            if not self.__is_vectorizable(template):
+                return super().find(template, limit)
+            rows = np.flatnonzero(self.__mask(template))
+            if limit is not None and limit > 0:
+                rows = rows[:limit]
+            return [self.__rows[row] for row in rows]
+
+    def find_extreme(self, template: Template, field: str, largest: bool = False) -> Tuple | None:
+        with self.__lock:
+            if not self.__is_vectorizable(template, field):
+                return super().find_extreme(template, field, largest)
+            rows = np.flatnonzero(self.__mask(template, field))
+            if not len(rows):
+                return None
+            column = self.__columns[field][rows]
+            row = rows[np.argmax(column) if largest else np.argmin(column)]
+            return self.__rows[row]
+
+    def remove(self, template: Template, limit: int | None = 1) -> Iterable[Tuple]:
+        with self.__lock:
+            removed = super().remove(template, limit)
+            for tuple in removed:
+                self.__drop_row(tuple)
+        return removed
+
+    def discard(self, tuple: Tuple) -> bool:
+        with self.__lock:
+            if not super().discard(tuple):
+                return False
+            self.__drop_row(tuple)
+            return True
+
+    def clear(self):
+        with self.__lock:
+            super().clear()
+            self.__reset()
+
+
+class ColumnarTupleSpace(TupleSpace):
+    def __init__(self, name: str, *tuples: Tuple, fields: Iterable[str], executor: Executor | None = None,
+                 chunk_size: int = TupleSpace.DEFAULT_CHUNK_SIZE, cache_size: int = 0):
+        tuples = ColumnarTupleRepository(*tuples, fields=fields, cache_size=cache_size)
+        requests = InMemoryRequestRepository()
+        super().__init__(name, tuples, requests, executor, chunk_size)
+
+
+logger.info("plinda.spaces.columnar module loaded.")
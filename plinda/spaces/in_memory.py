@@ -5,9 +5,13 @@ from builtins import tuple as pytuple
 
 
 class InMemoryTupleRepository(TupleRepository):
-    def __init__(self, *tuples: Tuple):
-        self.__tuples = set(tuples)
+    def __init__(self, *tuples: Tuple, cache_size: int = 0):
+        self.__tuples: set[Tuple] = set()
+        self.__by_value: dict[object, dict[str, Tuple]] = {}
+        self.__cache = MatchCache(cache_size)
         self.__lock = RLock()
+        for tuple in tuples:
+            self.add(tuple)
 
     def all_tuples(self) -> Iterable[Tuple]:
         with self.__lock:
@@ -17,18 +21,58 @@ class InMemoryTupleRepository(TupleRepository):
     def add(self, tuple: Tuple):
         with self.__lock:
             self.__tuples.add(tuple)
+            self.__by_value.setdefault(tuple.value_key, {})[tuple.id] = tuple
+
+    def __unindex(self, tuple: Tuple):
+        self.__cache.invalidate(tuple)
+        key = tuple.value_key
+        same_value = self.__by_value.get(key)
+        if same_value is not None:
+            same_value.pop(tuple.id, None)
+            if not same_value:
+                del self.__by_value[key]
 
     def find(self, template: Template, limit: int | None = None) -> Iterable[Tuple]:
         result = []
         with self.__lock:
             if limit is None or limit <= 0:
                 limit = len(self.__tuples)
-            for tuple in self.__tuples:
-                match = template.matches(tuple)
+            if isinstance(template, ExactTemplate):
+                candidates = self.__by_value.get(template.key, {}).values()
+            else:
+                candidates = self.__tuples
+            # scans larger than the cache would only evict it, so they bypass it
+            cached = len(candidates) <= self.__cache.max_size
+            for tuple in candidates:
+                if len(result) >= limit:
+                    break
+                match = self.__cache.matches(template, tuple) if cached else template.matches(tuple)
                 if match:
                     result.append(tuple)
         return result
 
+    def match(self, template: Template, tuple: Tuple) -> Match | None:
+        return self.__cache.matches(template, tuple)
+
+    def lookup(self, template: Template, tuple: Tuple) -> PyTuple[bool, Match | None]:
+        if len(self) > self.__cache.max_size:
+            return False, None
+        return self.__cache.lookup(template, tuple)
+
+    def remember(self, template: Template, tuple: Tuple, result: Match | None):
+        with self.__lock:
+            if tuple in self.__tuples and len(self.__tuples) <= self.__cache.max_size:
+                self.__cache.remember(template, tuple, result)
+
+    def is_indexed(self, template: Template) -> bool:
+        return isinstance(template, ExactTemplate)
+
+    def count(self, template: Template) -> int:
+        if isinstance(template, ExactTemplate):
+            with self.__lock:
+                return len(self.__by_value.get(template.key, {}))
+        return super().count(template)
+
     def remove(self, template: Template, limit: int | None = 1) -> Iterable[Tuple]:
         to_remove = []
         with self.__lock:
@@ -36,11 +80,22 @@ class InMemoryTupleRepository(TupleRepository):
                 to_remove.append(tuple)
             for tuple in to_remove:
                 self.__tuples.remove(tuple)
+                self.__unindex(tuple)
         return to_remove
 
+    def discard(self, tuple: Tuple) -> bool:
+        with self.__lock:
+            if tuple not in self.__tuples:
+                return False
+            self.__tuples.remove(tuple)
+            self.__unindex(tuple)
+            return True
+
     def clear(self):
         with self.__lock:
             self.__tuples.clear()
+            self.__by_value.clear()
+            self.__cache.clear()
 
     def __len__(self):
         with self.__lock:
@@ -101,10 +156,11 @@ class InMemoryRequestRepository(RequestRepository):
 
 
 class InMemoryTupleSpace(TupleSpace):
-    def __init__(self, name: str, *tuples: Tuple):
-        tuples = InMemoryTupleRepository(*tuples)
+    def __init__(self, name: str, *tuples: Tuple, executor: Executor | None = None,
+                 chunk_size: int = TupleSpace.DEFAULT_CHUNK_SIZE, cache_size: int = 0):
+        tuples = InMemoryTupleRepository(*tuples, cache_size=cache_size)
         requests = InMemoryRequestRepository()
-        super().__init__(name, tuples, requests)
+        super().__init__(name, tuples, requests, executor, chunk_size)
 
 
 logger.info("plinda.spaces.in_memory module loaded.")
@@ -1,6 +1,9 @@
 from plinda.tuples import *
 from plinda.log import logger
-from typing import Callable
+from typing import Callable, FrozenSet, Tuple as PyTuple
+from collections import OrderedDict
+from threading import RLock
+import operator
 import re
 
 
@@ -31,6 +34,8 @@ class Match:
 
 
 class Template:
+    cacheable = False
+
     def __init__(self, value):
         assert value is not None
         self.__value = value
@@ -72,6 +77,92 @@ class AnyTemplate(Template):
         return None
 
 
+class ExactTemplate(Template):
+    cacheable = True
+
+    def __init__(self, value):
+        if isinstance(value, Tuple):
+            value = value.value
+        super().__init__(value)
+        self.__key = value_key(value)
+        self.__hash = hash((type(self), self.__key))
+
+    @property
+    def key(self):
+        return self.__key
+
+    def matches(self, tuple: Tuple) -> Match | None:
+        if self.value == tuple.value:
+            return self._successful_match(tuple)
+        return None
+
+    def __hash__(self):
+        return self.__hash
+
+
+def numeric_field(tuple: Tuple, field: str) -> int | float | None:
+    if not isinstance(tuple, JsonTuple) or not isinstance(tuple.data, dict):
+        return None
+    value = tuple.data.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+class ComparisonTemplate(Template):
+    cacheable = True
+    OPERATORS: dict[str, Callable] = {
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+        "==": operator.eq,
+        "!=": operator.ne,
+    }
+
+    def __init__(self, *conditions: PyTuple[str, str, int | float]):
+        assert conditions, "At least one condition is required."
+        for field, op, value in conditions:
+            if op not in self.OPERATORS:
+                raise ValueError(f"Unsupported operator: {op}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"Cannot compare field '{field}' with non-numeric value: {value!r}")
+        super().__init__(tuple((field, op, value) for field, op, value in conditions))
+
+    @property
+    def conditions(self) -> PyTuple[PyTuple[str, str, int | float], ...]:
+        return self.value
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return frozenset(field for field, _, _ in self.conditions)
+
+    @classmethod
+    def can_match(cls, tuple_or_type: Tuple | type) -> bool:
+        if isinstance(tuple_or_type, type):
+            return issubclass(tuple_or_type, JsonTuple)
+        return isinstance(tuple_or_type, JsonTuple)
+
+    def matches(self, tuple: Tuple) -> Match | None:
+        for field, op, value in self.conditions:
+            actual = numeric_field(tuple, field)
+            if actual is None or not self.OPERATORS[op](actual, value):
+                return None
+        return self._successful_match(tuple)
+
+
+class RangeTemplate(ComparisonTemplate):
+    def __init__(self, field: str, lower: int | float | None = None, upper: int | float | None = None):
+        conditions = []
+        if lower is not None:
+            conditions.append((field, ">=", lower))
+        if upper is not None:
+            conditions.append((field, "<", upper))
+        if not conditions:
+            raise ValueError("At least one bound is required.")
+        super().__init__(*conditions)
+
+
 class RegexMatch(Match):
     def __init__(self, tuple: TextTuple, template: 'RegexTemplate', match: re.Match):
         assert isinstance(tuple, TextTuple)
@@ -98,6 +189,8 @@ class RegexMatch(Match):
 
 
 class RegexTemplate(Template):
+    cacheable = True
+
     def __init__(self, pattern: re.Pattern | str):
         if isinstance(pattern, str):
             pattern = re.compile(pattern)
@@ -127,4 +220,68 @@ class RegexTemplate(Template):
         return None
 
 
+class MatchCache:
+    DEFAULT_MAX_SIZE = 4096
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        assert max_size >= 0
+        self.__max_size = max_size
+        self.__results: OrderedDict[tuple, Match | None] = OrderedDict()
+        self.__by_tuple: dict[str, set[Template]] = {}
+        self.__lock = RLock()
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    def matches(self, template: Template, tuple: Tuple) -> Match | None:
+        known, result = self.lookup(template, tuple)
+        if known:
+            return result
+        result = template.matches(tuple)
+        self.remember(template, tuple, result)
+        return result
+
+    def lookup(self, template: Template, tuple: Tuple) -> PyTuple[bool, Match | None]:
+        if self.__max_size == 0 or not template.cacheable:
+            return False, None
+        key = (template, tuple.id)
+        with self.__lock:
+            if key in self.__results:
+                self.__results.move_to_end(key)
+                return True, self.__results[key]
+        return False, None
+
+    def remember(self, template: Template, tuple: Tuple, result: Match | None):
+        if self.__max_size == 0 or not template.cacheable:
+            return
+        with self.__lock:
+            self.__results[(template, tuple.id)] = result
+            self.__by_tuple.setdefault(tuple.id, set()).add(template)
+            while len(self.__results) > self.__max_size:
+                (evicted_template, evicted_id), _ = self.__results.popitem(last=False)
+                self.__forget(evicted_template, evicted_id)
+
+    def __forget(self, template: Template, tuple_id: str):
+        templates = self.__by_tuple.get(tuple_id)
+        if templates is not None:
+            templates.discard(template)
+            if not templates:
+                del self.__by_tuple[tuple_id]
+
+    def invalidate(self, tuple: Tuple):
+        with self.__lock:
+            for template in self.__by_tuple.pop(tuple.id, ()):
+                self.__results.pop((template, tuple.id), None)
+
+    def clear(self):
+        with self.__lock:
+            self.__results.clear()
+            self.__by_tuple.clear()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__results)
+
+
 logger.info("plinda.templates module loaded.")
\ No newline at end of file
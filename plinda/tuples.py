@@ -3,6 +3,19 @@ import json
 from plinda.log import logger
 
 
+def value_key(value):
+    # containers are tagged with their type, so that e.g. [1, 2] and (1, 2) get different keys
+    if isinstance(value, dict):
+        return dict, frozenset((k, value_key(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return list, tuple(value_key(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple, tuple(value_key(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset(value_key(v) for v in value)
+    return value
+
+
 class Tuple:
     def __init__(self):
         self.__id = uuid.uuid4()
@@ -18,6 +31,10 @@ class Tuple:
     def value(self):
         return self._value()
 
+    @property
+    def value_key(self):
+        return value_key(self.value)
+
     def value_equals(self, other: 'Tuple') -> bool:
         return self.value == other.value
 
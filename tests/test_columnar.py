@@ -0,0 +1,114 @@
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from plinda import *
+import asyncio
+
+try:
+    from plinda.spaces.columnar import ColumnarTupleRepository, ColumnarTupleSpace
+except ImportError:  # numpy is not installed
+    ColumnarTupleRepository = ColumnarTupleSpace = None
+
+
+@unittest.skipIf(ColumnarTupleRepository is None, "numpy is not installed")
+class TestColumnarTupleRepository(unittest.TestCase):
+    def setUp(self):
+        self.tasks = [JsonTuple({"priority": i, "size": 1000 * i}) for i in range(10)]
+        self.other = JsonTuple({"name": "not a task"})
+        self.text = TextTuple("priority 9")
+        self.repository = ColumnarTupleRepository(*self.tasks, self.other, self.text, fields=["priority", "size"])
+
+    def test_find(self):
+        template = ComparisonTemplate(("priority", ">", 5), ("size", "<", 9000))
+        self.assertEqual(set(self.repository.find(template)), set(self.tasks[6:9]))
+        self.assertEqual(len(list(self.repository.find(template, limit=2))), 2)
+
+    def test_find_on_undeclared_field(self):
+        self.repository.add(task := JsonTuple({"priority": 1, "weight": 3}))
+        self.assertEqual(list(self.repository.find(ComparisonTemplate(("weight", "==", 3)))), [task])
+
+    def test_non_columnar_templates(self):
+        self.assertEqual(list(self.repository.find(RegexTemplate(r"^priority"))), [self.text])
+
+    def test_remove(self):
+        template = RangeTemplate("priority", 2, 4)
+        removed = list(self.repository.remove(template, limit=None))
+        self.assertEqual(set(removed), set(self.tasks[2:4]))
+        self.assertEqual(list(self.repository.find(template)), [])
+        self.assertEqual(len(self.repository), len(self.tasks))
+
+    def test_rows_are_reused_and_grown(self):
+        self.repository.remove(RangeTemplate("priority", 0, 10), limit=None)
+        added = [JsonTuple({"priority": i}) for i in range(200)]
+        for task in added:
+            self.repository.add(task)
+        self.assertEqual(set(self.repository.find(RangeTemplate("priority", 100))), set(added[100:]))
+
+    def test_find_extreme(self):
+        template = RangeTemplate("size", upper=5000)
+        self.assertEqual(self.repository.find_extreme(template, "priority"), self.tasks[0])
+        self.assertEqual(self.repository.find_extreme(template, "priority", largest=True), self.tasks[4])
+        self.assertIsNone(self.repository.find_extreme(RangeTemplate("size", 10 ** 6), "priority"))
+
+    def assert_agrees_with_scalar(self, repository, tuples, template):
+        expected = {t for t in tuples if template.matches(t)}
+        self.assertEqual(set(repository.find(template)), expected, template)
+
+    def test_agrees_with_scalar_matching(self):
+        ns = 1_700_000_000_123_456_789
+        values = [2 ** 53, 2 ** 53 + 1, -2 ** 53 - 1, 2 ** 63 - 1, -2 ** 63, ns, ns + 1, 0, 7]
+        thresholds = [2 ** 53, 2 ** 53 + 1, ns, ns + 0.5, float(ns), 2 ** 63, -2 ** 64, 6.5, 7.0,
+                      float("inf"), float("-inf"), float("nan")]
+        for extra in ([], [0.5], [2 ** 70]):
+            tuples = [JsonTuple({"ts": value}) for value in values + extra]
+            repository = ColumnarTupleRepository(*tuples, fields=["ts"])
+            for threshold in thresholds:
+                for op in ComparisonTemplate.OPERATORS:
+                    self.assert_agrees_with_scalar(repository, tuples, ComparisonTemplate(("ts", op, threshold)))
+            template = RangeTemplate("ts", 2 ** 53)
+            expected = max((t for t in tuples if template.matches(t)), key=lambda t: t.data["ts"])
+            self.assertEqual(repository.find_extreme(template, "ts", largest=True), expected)
+            expected = min((t for t in tuples if template.matches(t)), key=lambda t: t.data["ts"])
+            self.assertEqual(repository.find_extreme(template, "ts"), expected)
+
+    def test_large_ints_stay_vectorized(self):
+        repository = ColumnarTupleRepository(JsonTuple({"ts": 2 ** 53 + 1}), fields=["ts"])
+        self.assertTrue(repository.is_indexed(ComparisonTemplate(("ts", "==", 2 ** 53))))
+        self.assertEqual(list(repository.find(ComparisonTemplate(("ts", "==", 2 ** 53)))), [])
+        self.assertEqual(len(list(repository.find(ComparisonTemplate(("ts", ">", 2 ** 53))))), 1)
+
+    def test_clear(self):
+        self.repository.clear()
+        self.assertEqual(list(self.repository.find(RangeTemplate("priority", 0))), [])
+        self.repository.add(self.tasks[0])
+        self.assertEqual(list(self.repository.find(RangeTemplate("priority", 0))), [self.tasks[0]])
+
+
+@unittest.skipIf(ColumnarTupleSpace is None, "numpy is not installed")
+class TestColumnarTupleSpace(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tasks = [JsonTuple({"priority": i, "size": 1000 * i}) for i in range(10)]
+        self.ts = ColumnarTupleSpace("test-columnar", *self.tasks, fields=["priority", "size"])
+        self.template = ComparisonTemplate(("priority", ">", 5), ("size", "<", 9000))
+
+    async def test_try_take(self):
+        match = await self.ts.try_take(self.template)
+        self.assertIn(match.tuple, self.tasks[6:9])
+        self.assertEqual(len(list(await self.ts.get_all())), len(self.tasks) - 1)
+
+    async def test_try_take_min_and_max(self):
+        self.assertEqual((await self.ts.try_take_min(self.template, "priority")).tuple, self.tasks[6])
+        self.assertEqual((await self.ts.try_take_max(self.template, "priority")).tuple, self.tasks[8])
+        self.assertEqual((await self.ts.try_read_min(self.template, "size")).tuple, self.tasks[7])
+        self.assertEqual((await self.ts.try_read_max(self.template, "size")).tuple, self.tasks[7])
+        self.assertEqual(await self.ts.count(self.template), 1)
+
+    async def test_write_resumes_take(self):
+        pending = asyncio.create_task(self.ts.take(RangeTemplate("priority", 100)))
+        await asyncio.sleep(0)
+        await self.ts.write(task := JsonTuple({"priority": 100}))
+        self.assertEqual((await pending).tuple, task)
+        self.assertIsNone(await self.ts.try_read(RangeTemplate("priority", 100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
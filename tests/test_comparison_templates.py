@@ -0,0 +1,57 @@
+import unittest
+from plinda import ComparisonTemplate, RangeTemplate, TextTuple, JsonTuple, Match
+
+
+class TestComparisonTemplate(unittest.TestCase):
+    template = ComparisonTemplate(("priority", ">", 5), ("size", "<", 2 ** 20))
+    matching_tuple = JsonTuple({"priority": 7, "size": 1024})
+    non_matching_tuple = JsonTuple({"priority": 7, "size": 2 ** 21})
+    missing_field_tuple = JsonTuple({"priority": 7})
+    non_numeric_tuple = JsonTuple({"priority": "7", "size": 1024})
+
+    def test_conditions(self):
+        self.assertEqual(self.template.conditions, (("priority", ">", 5), ("size", "<", 2 ** 20)))
+        self.assertEqual(self.template.fields, {"priority", "size"})
+
+    def test_can_match(self):
+        self.assertTrue(ComparisonTemplate.can_match(JsonTuple))
+        self.assertFalse(ComparisonTemplate.can_match(TextTuple))
+        self.assertFalse(ComparisonTemplate.can_match(TextTuple("7")))
+
+    def test_hashing(self):
+        s = {self.template, ComparisonTemplate(("priority", ">", 5), ("size", "<", 2 ** 20))}
+        self.assertEqual(len(s), 1)
+
+    def test_successful_match(self):
+        match = self.template.matches(self.matching_tuple)
+        self.assertIsInstance(match, Match)
+        self.assertEqual(match.tuple, self.matching_tuple)
+
+    def test_unsuccessful_match(self):
+        self.assertIsNone(self.template.matches(self.non_matching_tuple))
+        self.assertIsNone(self.template.matches(self.missing_field_tuple))
+        self.assertIsNone(self.template.matches(self.non_numeric_tuple))
+        self.assertIsNone(self.template.matches(TextTuple("priority 7")))
+
+    def test_invalid_conditions(self):
+        with self.assertRaises(ValueError):
+            ComparisonTemplate(("priority", "~", 5))
+        with self.assertRaises(TypeError):
+            ComparisonTemplate(("priority", ">", "5"))
+
+
+class TestRangeTemplate(unittest.TestCase):
+    def test_bounds(self):
+        template = RangeTemplate("priority", 1, 5)
+        self.assertEqual(template.conditions, (("priority", ">=", 1), ("priority", "<", 5)))
+        self.assertIsNotNone(template.matches(JsonTuple({"priority": 1})))
+        self.assertIsNone(template.matches(JsonTuple({"priority": 5})))
+
+    def test_open_bounds(self):
+        self.assertEqual(RangeTemplate("priority", upper=5).conditions, (("priority", "<", 5),))
+        with self.assertRaises(ValueError):
+            RangeTemplate("priority")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from plinda import ExactTemplate, TextTuple, JsonTuple, Match
+
+
+class TestExactTemplate(unittest.TestCase):
+    value = {"token": "lock", "owners": [1, 2]}
+    template = ExactTemplate(value)
+    matching_tuple = JsonTuple({"owners": [1, 2], "token": "lock"})
+    non_matching_tuple = JsonTuple({"token": "lock", "owners": [2, 1]})
+    text_tuple = TextTuple("lock")
+
+    def test_getting_value(self):
+        self.assertEqual(self.template.value, self.value)
+
+    def test_value_from_tuple(self):
+        self.assertEqual(ExactTemplate(self.matching_tuple), self.template)
+
+    def test_equality(self):
+        self.assertEqual(self.template, ExactTemplate({"owners": [1, 2], "token": "lock"}))
+        self.assertNotEqual(self.template, ExactTemplate(self.non_matching_tuple))
+
+    def test_hashing(self):
+        s = set()
+        s.add(self.template)
+        s.add(ExactTemplate({"owners": [1, 2], "token": "lock"}))
+        self.assertEqual(len(s), 1)
+
+    def test_successful_match(self):
+        match = self.template.matches(self.matching_tuple)
+        self.assertIsInstance(match, Match)
+        self.assertEqual(match.tuple, self.matching_tuple)
+        self.assertEqual(match.template, self.template)
+
+    def test_unsuccessful_match(self):
+        self.assertIsNone(self.template.matches(self.non_matching_tuple))
+        self.assertIsNone(self.template.matches(self.text_tuple))
+
+    def test_text_match(self):
+        self.assertIsNotNone(ExactTemplate("lock").matches(self.text_tuple))
+        self.assertIsNotNone(ExactTemplate("lock").matches(JsonTuple("lock")))
+
+
+if __name__ == '__main__':
+    unittest.main()
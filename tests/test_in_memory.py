@@ -1,13 +1,21 @@
 from unittest import IsolatedAsyncioTestCase
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from plinda import *
+from plinda.templates import AnyTemplate
+from plinda.spaces.in_memory import InMemoryTupleRepository
+import asyncio
+import gc
+import weakref
 
 
 class TestInMemoryTupleSpace(IsolatedAsyncioTestCase):
-    ts_empty = InMemoryTupleSpace("test-empty")
     tuple = TextTuple("hello world")
-    ts_with_initial_tuples = InMemoryTupleSpace("test-initial", tuple)
     template = RegexTemplate(r"hello (\w+)")
 
+    def setUp(self):
+        self.ts_empty = InMemoryTupleSpace("test-empty")
+        self.ts_with_initial_tuples = InMemoryTupleSpace("test-initial", self.tuple)
+
     def test_name(self):
         self.assertEqual(self.ts_empty.name, "test-empty")
         self.assertEqual(self.ts_with_initial_tuples.name, "test-initial")
@@ -17,12 +25,12 @@ class TestInMemoryTupleSpace(IsolatedAsyncioTestCase):
             self.fail("TupleSpace should be empty")
 
     async def test_is_not_empty(self):
-        initial_content = {await self.ts_with_initial_tuples.get_all()}
+        initial_content = set(await self.ts_with_initial_tuples.get_all())
         self.assertEqual({self.tuple}, initial_content)
 
     async def test_adding_tuples(self):
         await self.ts_empty.write(self.tuple)
-        all_tuples = {await self.ts_empty.get_all()}
+        all_tuples = set(await self.ts_empty.get_all())
         self.assertEqual({self.tuple}, all_tuples)
 
     async def test_successful_try_read(self):
@@ -31,3 +39,228 @@ class TestInMemoryTupleSpace(IsolatedAsyncioTestCase):
         self.assertIsInstance(match, RegexMatch)
         self.assertEqual(match[1], "world")
         await self.test_is_not_empty()
+
+
+class TestOffloadedInMemoryTupleSpace(IsolatedAsyncioTestCase):
+    tuples = [TextTuple(f"hello {i}") for i in range(10)] + [TextTuple("goodbye world")]
+    template = RegexTemplate(r"goodbye (\w+)")
+
+    def setUp(self):
+        self.threads = ThreadPoolExecutor(max_workers=2)
+        self.processes = ProcessPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.threads.shutdown()
+        self.processes.shutdown()
+
+    async def test_try_read_in_thread_pool(self):
+        ts = InMemoryTupleSpace("test-threads", *self.tuples, executor=self.threads, chunk_size=3)
+        match = await ts.try_read(AnyTemplate(lambda t: t.value.startswith("goodbye")))
+        self.assertIsNotNone(match)
+        self.assertEqual(match.tuple, self.tuples[-1])
+
+    async def test_try_read_in_process_pool(self):
+        ts = InMemoryTupleSpace("test-processes", *self.tuples, executor=self.processes, chunk_size=3)
+        match = await ts.try_read(self.template)
+        self.assertIsInstance(match, RegexMatch)
+        self.assertEqual(match[1], "world")
+
+    async def test_unpicklable_template_in_process_pool(self):
+        ts = InMemoryTupleSpace("test-processes", *self.tuples, executor=self.processes, chunk_size=3)
+        match = await ts.try_read(AnyTemplate(lambda t: t.value == "hello 3"))
+        self.assertEqual(match.tuple, self.tuples[3])
+
+    async def test_try_take_in_process_pool(self):
+        ts = InMemoryTupleSpace("test-processes", *self.tuples, executor=self.processes, chunk_size=3)
+        match = await ts.try_take(self.template)
+        self.assertEqual(match.tuple, self.tuples[-1])
+        self.assertIsNone(await ts.try_take(self.template))
+        self.assertEqual(len(list(await ts.get_all())), len(self.tuples) - 1)
+
+    async def test_offloaded_polling_uses_cache(self):
+        calls = []
+
+        def predicate(tuple):
+            calls.append(tuple)
+            return tuple.value == "goodbye world"
+
+        template = AnyTemplate(predicate)
+        template.cacheable = True
+        missing = AnyTemplate(lambda t: calls.append(t) or False)
+        missing.cacheable = True
+        ts = InMemoryTupleSpace("test-threads", *self.tuples, executor=self.threads, chunk_size=3, cache_size=64)
+        for expected in (template, missing):
+            await ts.try_read(expected)
+            calls.clear()
+            await ts.try_read(expected)
+            self.assertEqual(calls, [])
+
+    async def test_unpicklable_templates_fall_back(self):
+        class Unreducible(RegexTemplate):
+            def __reduce__(self):
+                raise RuntimeError("cannot be reduced")
+
+        class Unhashable(Unreducible):
+            __hash__ = None
+
+        ts = InMemoryTupleSpace("test-processes", *self.tuples, executor=self.processes, chunk_size=3)
+        for template in (Unreducible(r"goodbye (\w+)"), Unhashable(r"goodbye (\w+)")):
+            self.assertEqual((await ts.try_read(template))[1], "world")
+
+    async def test_templates_are_not_retained(self):
+        ts = InMemoryTupleSpace("test-processes", *self.tuples, executor=self.processes, chunk_size=3)
+        template = AnyTemplate(lambda t: t.value == "hello 3")
+        await ts.try_read(template)
+        reference = weakref.ref(template)
+        del template
+        gc.collect()
+        self.assertIsNone(reference())
+
+    async def test_extremes_are_offloaded(self):
+        submitted = []
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                submitted.append(args)
+                return super().submit(*args, **kwargs)
+
+        tasks = [JsonTuple({"priority": i}) for i in range(10)]
+        template = AnyTemplate(lambda t: t.data["priority"] % 2 == 0)
+        with RecordingExecutor(max_workers=2) as executor:
+            ts = InMemoryTupleSpace("test-extremes", *tasks, executor=executor, chunk_size=3)
+            self.assertEqual((await ts.try_read_max(template, "priority")).tuple, tasks[8])
+            self.assertEqual((await ts.try_take_min(template, "priority")).tuple, tasks[0])
+            self.assertEqual((await ts.try_take_min(template, "priority")).tuple, tasks[2])
+        self.assertTrue(submitted)
+
+    async def test_write_during_offloaded_take_resumes_it(self):
+        ts = InMemoryTupleSpace("test-threads", TextTuple("noise"), TextTuple("more noise"),
+                                executor=self.threads, chunk_size=1)
+        pending = asyncio.create_task(ts.take(RegexTemplate(r"job (\d+)")))
+        await asyncio.sleep(0)
+        await ts.write(TextTuple("job 1"))
+        match = await asyncio.wait_for(pending, timeout=1)
+        self.assertEqual(match[1], "1")
+        self.assertEqual({t.value for t in await ts.get_all()}, {"noise", "more noise"})
+
+    async def test_small_spaces_are_not_offloaded(self):
+        submitted = []
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                submitted.append(args)
+                return super().submit(*args, **kwargs)
+
+        with RecordingExecutor(max_workers=1) as executor:
+            ts = InMemoryTupleSpace("test-small", *self.tuples, executor=executor, chunk_size=len(self.tuples))
+            self.assertIsNotNone(await ts.try_read(self.template))
+            self.assertEqual(submitted, [])
+            await ts.write(TextTuple("one more"))
+            self.assertIsNotNone(await ts.try_read(self.template))
+            self.assertEqual(len(submitted), 2)
+
+
+class TestExactLookup(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tokens = [JsonTuple({"token": "sem"}) for _ in range(3)]
+        self.other = JsonTuple({"token": "other"})
+        self.ts = InMemoryTupleSpace("test-exact", *self.tokens, self.other)
+        self.template = ExactTemplate({"token": "sem"})
+
+    async def test_count(self):
+        self.assertEqual(await self.ts.count(self.template), 3)
+        self.assertEqual(await self.ts.count(ExactTemplate({"token": "missing"})), 0)
+
+    async def test_try_read(self):
+        match = await self.ts.try_read(self.template)
+        self.assertIn(match.tuple, self.tokens)
+        self.assertEqual(await self.ts.count(self.template), 3)
+
+    async def test_try_take_one_at_a_time(self):
+        taken = set()
+        for remaining in (2, 1, 0):
+            match = await self.ts.try_take(self.template)
+            taken.add(match.tuple)
+            self.assertEqual(await self.ts.count(self.template), remaining)
+        self.assertEqual(taken, set(self.tokens))
+        self.assertIsNone(await self.ts.try_take(self.template))
+        self.assertEqual(set(await self.ts.get_all()), {self.other})
+
+    async def test_write_updates_index(self):
+        await self.ts.write(JsonTuple({"token": "sem"}))
+        self.assertEqual(await self.ts.count(self.template), 4)
+
+    async def test_try_read_evaluates_a_single_duplicate(self):
+        calls = []
+
+        class CountingExactTemplate(ExactTemplate):
+            def matches(self, tuple):
+                calls.append(tuple)
+                return super().matches(tuple)
+
+        ts = InMemoryTupleSpace("test-duplicates", *[JsonTuple({"token": "sem"}) for _ in range(1000)])
+        self.assertIsNotNone(await ts.try_read(CountingExactTemplate({"token": "sem"})))
+        self.assertLessEqual(len(calls), 2)
+
+    async def test_lists_and_tuples_are_distinct(self):
+        await self.ts.write(JsonTuple([1, 2]))
+        await self.ts.write(JsonTuple({"a": (1, [2])}))
+        await self.ts.write(JsonTuple((1, 2)))
+        for value in ([1, 2], (1, 2), {"a": (1, [2])}):
+            template = ExactTemplate(value)
+            self.assertEqual(await self.ts.count(template), 1)
+            self.assertEqual((await self.ts.try_read(template)).tuple.value, value)
+
+
+class TestCachedMatching(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.tuples = [TextTuple(f"hello {i}") for i in range(5)]
+        self.ts = InMemoryTupleSpace("test-cache", *self.tuples, cache_size=16)
+
+    def predicate(self, tuple):
+        self.calls += 1
+        return tuple.value == "hello 4"
+
+    def cacheable_template(self):
+        template = AnyTemplate(self.predicate)
+        template.cacheable = True
+        return template
+
+    async def test_repeated_polling_hits_cache(self):
+        template = self.cacheable_template()
+        for _ in range(3):
+            match = await self.ts.try_read(template)
+            self.assertEqual(match.tuple, self.tuples[4])
+        self.assertLessEqual(self.calls, len(self.tuples))
+
+    async def test_cache_is_disabled_by_default(self):
+        ts = InMemoryTupleSpace("test-no-cache", *self.tuples)
+        template = self.cacheable_template()
+        await ts.try_read(template)
+        calls = self.calls
+        await ts.try_read(template)
+        self.assertEqual(self.calls, 2 * calls)
+
+    async def test_scans_larger_than_the_cache_bypass_it(self):
+        repository = InMemoryTupleRepository(*self.tuples, cache_size=2)
+        hot = self.cacheable_template()
+        self.assertIsNotNone(repository.match(hot, self.tuples[4]))
+        calls = self.calls
+        other = AnyTemplate(lambda _: False)
+        other.cacheable = True
+        self.assertEqual(list(repository.find(other)), [])
+        self.assertIsNotNone(repository.match(hot, self.tuples[4]))
+        self.assertEqual(self.calls, calls)
+
+    async def test_predicates_are_not_cached(self):
+        deadline_passed = False
+        template = AnyTemplate(lambda _: deadline_passed)
+        self.assertIsNone(await self.ts.try_read(template))
+        deadline_passed = True
+        self.assertIsNotNone(await self.ts.try_read(template))
+
+    async def test_removed_tuples_are_not_matched(self):
+        template = self.cacheable_template()
+        self.assertIsNotNone(await self.ts.try_take(template))
+        self.assertIsNone(await self.ts.try_read(template))
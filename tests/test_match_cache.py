@@ -0,0 +1,80 @@
+import unittest
+from plinda import MatchCache, RegexTemplate, TextTuple
+from plinda.templates import AnyTemplate
+
+
+class CountingTemplate(AnyTemplate):
+    cacheable = True
+
+    def __init__(self, expected: str):
+        self.calls = 0
+
+        def predicate(tuple):
+            self.calls += 1
+            return tuple.value == expected
+
+        super().__init__(predicate)
+
+
+class TestMatchCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MatchCache(max_size=2)
+        self.hello = TextTuple("hello")
+        self.world = TextTuple("world")
+        self.template = CountingTemplate("hello")
+
+    def test_positive_results_are_cached(self):
+        first = self.cache.matches(self.template, self.hello)
+        second = self.cache.matches(self.template, self.hello)
+        self.assertIsNotNone(first)
+        self.assertIs(first, second)
+        self.assertEqual(self.template.calls, 1)
+
+    def test_negative_results_are_cached(self):
+        self.assertIsNone(self.cache.matches(self.template, self.world))
+        self.assertIsNone(self.cache.matches(self.template, self.world))
+        self.assertEqual(self.template.calls, 1)
+
+    def test_equal_templates_share_entries(self):
+        self.cache.matches(RegexTemplate(r"hel+o"), self.hello)
+        self.cache.matches(RegexTemplate(r"hel+o"), self.hello)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        other = TextTuple("other")
+        self.cache.matches(self.template, self.hello)
+        self.cache.matches(self.template, self.world)
+        self.cache.matches(self.template, self.hello)
+        self.cache.matches(self.template, other)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.matches(self.template, self.hello)
+        self.assertEqual(self.template.calls, 3)
+        self.cache.matches(self.template, self.world)
+        self.assertEqual(self.template.calls, 4)
+
+    def test_invalidate(self):
+        self.cache.matches(self.template, self.hello)
+        self.cache.matches(self.template, self.world)
+        self.cache.invalidate(self.hello)
+        self.assertEqual(len(self.cache), 1)
+        self.cache.matches(self.template, self.hello)
+        self.assertEqual(self.template.calls, 3)
+
+    def test_uncacheable_templates_are_not_cached(self):
+        flag = [False]
+        template = AnyTemplate(lambda _: flag[0])
+        self.assertIsNone(self.cache.matches(template, self.hello))
+        flag[0] = True
+        self.assertIsNotNone(self.cache.matches(template, self.hello))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_disabled(self):
+        cache = MatchCache(max_size=0)
+        cache.matches(self.template, self.hello)
+        cache.matches(self.template, self.hello)
+        self.assertEqual(self.template.calls, 2)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()